@@ -0,0 +1,8 @@
+"""
+file: __init__.py
+
+brief: Package exports for conpycon.
+"""
+
+from conpycon.console import Console
+from conpycon.parser import CommandParser, Namespace
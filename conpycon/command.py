@@ -0,0 +1,179 @@
+"""
+file: command.py
+
+brief: Classes that make up the console's command tree.
+"""
+
+class Trie:
+    """
+    brief: A dict-of-dicts prefix tree over a set of names.
+    """
+    # Key under which a completed name is stored at its final node.
+    # Names are single command tokens, so this never collides.
+    _LEAF = '\0'
+
+    __slots__ = ('_root',)
+
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, name):
+        """
+        brief: Inserts a name into the trie.
+
+        param: name - The name to insert.
+        """
+        node = self._root
+        for ch in name:
+            node = node.setdefault(ch, {})
+        node[self._LEAF] = name
+
+    def match(self, prefix):
+        """
+        brief: Finds all inserted names beginning with a prefix.
+
+        The walk stops at the first character with no edge, so a
+        prefix with no completions is rejected in O(len(prefix)).
+
+        param: prefix - The prefix to match.
+
+        return: The list of matching names.
+        """
+        node = self._root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        names = []
+        stack = [node]
+        while stack:
+            cur = stack.pop()
+            for key, child in cur.items():
+                if key == self._LEAF:
+                    names.append(child)
+                else:
+                    stack.append(child)
+        return names
+
+    def common_prefix(self, prefix):
+        """
+        brief: Extends a prefix as far as all matching names agree.
+
+        Walks down from the prefix while exactly one edge continues,
+        which costs O(answer length) rather than a scan over every
+        matching name.
+
+        param: prefix - The starting prefix; must have matches.
+
+        return: The longest common prefix of the matching names.
+        """
+        node = self._root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return prefix
+        out = [prefix]
+        while len(node) == 1 and self._LEAF not in node:
+            ch, node = next(iter(node.items()))
+            out.append(ch)
+        return "".join(out)
+
+class CommandNode:
+    """
+    brief: A single node in the name tree used for tab completion.
+
+    Slotted: one node exists per command name and its attributes are
+    read on every TAB keystroke, so skipping the per-instance __dict__
+    saves both memory and a dict lookup per access.
+    """
+    __slots__ = ('name', 'children', 'children_by_name', 'trie',
+                 '_completion_cache')
+
+    def __init__(self, name):
+        self.name = name
+        self.children = []
+        self.children_by_name = {}
+        self.trie = Trie()
+        self._completion_cache = {}
+
+    def add_child(self, node):
+        """
+        brief: Adds a child node to this node.
+
+        param: node - The CommandNode to add.
+        """
+        self.children.append(node)
+        self.children_by_name[node.name] = node
+        self.trie.insert(node.name)
+        self._completion_cache.clear()
+
+    def completions(self, token):
+        """
+        brief: Finds the child names completing a typed token, along
+               with their longest common prefix.
+
+        Results are memoized per token, since the same prefix is
+        typically completed many times in a session.
+
+        param: token - The typed token.
+
+        return: A (names, prefix) tuple.
+        """
+        hit = self._completion_cache.get(token)
+        if hit is None:
+            names = self.trie.match(token)
+            if len(names) > 1:
+                # The trie walk enumerates in node order; present the
+                # matches in declaration order, as the children were
+                # added.
+                matched = set(names)
+                names = [n for n in self.children_by_name
+                         if n in matched]
+            hit = (names, self.trie.common_prefix(token) if names else "")
+            self._completion_cache[token] = hit
+        return hit
+
+    def find(self, name):
+        """
+        brief: Searches this node's subtree for a node by name.
+
+        Direct children resolve through the name index in O(1); deeper
+        matches fall back to a depth-first walk with an explicit stack,
+        visiting children in first-child-first order.
+
+        param: name - The node name to search for.
+
+        return: The matching CommandNode, or None.
+        """
+        if self.name == name:
+            return self
+        child = self.children_by_name.get(name)
+        if child is not None:
+            return child
+        stack = list(reversed(self.children))
+        while stack:
+            cur = stack.pop()
+            if cur.name == name:
+                return cur
+            stack.extend(reversed(cur.children))
+        return None
+
+class Command:
+    """
+    brief: A runnable command bound to a function from the symbol table.
+    """
+    __slots__ = ('name', 'func', 'parent', 'children')
+
+    def __init__(self, name, func, parent=None):
+        self.name = name
+        self.func = func
+        self.parent = parent
+        self.children = []
+
+    def add_child(self, command):
+        """
+        brief: Adds a subcommand to this command.
+
+        param: command - The Command to add.
+        """
+        self.children.append(command)
@@ -0,0 +1,571 @@
+"""
+file: console.py
+
+brief: The Console class, which drives an interactive console session
+       from a YAML command file.
+"""
+
+import collections
+import hashlib
+import os
+import pickle
+import re
+import sys
+import tempfile
+
+from conpycon.command import Command, CommandNode
+from conpycon.error import (
+    CommandActionNotFound,
+    CommandError,
+    CommandInvalidTypeError,
+    CommandNoCommandsError,
+    DispatchError,
+    DispatchNotFoundError,
+)
+from conpycon.get_key import Key, get_key, get_printable_run
+
+# The maximum number of commands retained in history.
+MAX_HIST_LEN = 20
+
+# The maximum length of a single command.
+MAX_CMD_LEN = 1024
+
+DEFAULT_PROMPT = '> '
+
+# Commands that end the console session, compared case-folded.
+_EXIT_CMDS = frozenset(("exit", "quit", "q"))
+
+# Pre-formatted message labels; building these per error is wasted work.
+_ERR = "[\033[31mError\033[0m]"
+_USG = "[\033[36mUsage\033[0m]"
+_POS = "[\033[36mPositionals\033[0m]"
+
+# Where parsed command files are cached between runs.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'conpycon')
+
+# The yaml module and loader, imported on first use so that importing
+# conpycon does not pay for PyYAML when no command file is parsed.
+_yaml = None
+_yaml_loader = None
+
+# Matches the characters that force a full shlex tokenization.
+_SHLEX_SPECIAL = re.compile(r"[\"'\\]").search
+
+# Parsed YAML keyed by (absolute path, mtime); repeated Console
+# construction over the same file skips the parse entirely.
+_YAML_CACHE = {}
+
+# Maps YAML type names to Python types for command arguments.
+TYPE_DICT = {
+    'str': str,
+    'int': int,
+    'float': float,
+}
+
+def _split_cmd(cmd_str):
+    """
+    brief: Tokenizes a command line, skipping shlex when possible.
+
+    Most command lines carry no quoting, so str.split covers them;
+    shlex only runs when quote or escape characters are present.
+
+    param: cmd_str - The command line to tokenize.
+
+    return: The list of tokens.
+    """
+    if not _SHLEX_SPECIAL(cmd_str):
+        return cmd_str.split()
+    import shlex
+    return shlex.split(cmd_str)
+
+class Console:
+    """
+    brief: An interactive console defined by a YAML command file.
+
+    The command file maps command names to actions, which are bound
+    against the caller's symbol table when the console is constructed.
+    """
+    def __init__(self, command_file, symbol_table,
+                 prompt=DEFAULT_PROMPT, intro=None):
+        self.prompt_str = prompt
+        self.intro = intro
+        self.symbol_table = symbol_table
+        self.history = collections.deque(maxlen=MAX_HIST_LEN)
+        self.is_running = False
+
+        # Raw command definitions, materialized into Command objects
+        # lazily on first dispatch, and the name tree for completion.
+        self._raw_commands = {}
+        self._cmd_index = {}
+        # Parsers bucketed by command-name length; the name set is
+        # fixed at construction, so an input token whose length hits
+        # no bucket is rejected on a single int lookup.
+        self._parsers_by_len = {}
+        self._cmd_lens = frozenset()
+        self._node_tree = CommandNode('')
+
+        self._parse_command_file(command_file)
+
+    def run(self):
+        """
+        brief: Runs the console until an exit command or EOF.
+        """
+        if self.intro is not None:
+            print(self.intro)
+        self.is_running = True
+        while self.is_running:
+            try:
+                cmd_str = self._prompt()
+            except KeyboardInterrupt:
+                print()
+                break
+            cmd_parse = _split_cmd(cmd_str)
+            if len(cmd_parse) == 0:
+                continue
+            self.history.appendleft(cmd_str)
+            if cmd_parse[0].lower() in _EXIT_CMDS:
+                break
+            try:
+                self._dispatch(cmd_parse)
+            except KeyboardInterrupt:
+                print()
+                continue
+            except SystemExit:
+                continue
+            except (CommandError, DispatchError) as e:
+                print(_ERR, e)
+        self.is_running = False
+
+    def _load_yaml(self, file):
+        """
+        brief: Loads the YAML command file into a dict.
+
+        param: file - The path of the command file.
+
+        return: The parsed YAML data.
+        """
+        global _yaml, _yaml_loader
+        if _yaml is None:
+            import yaml
+            _yaml = yaml
+            # LibYAML dispatches parsing to C and is much faster than
+            # the pure-Python loader; fall back when the wheel lacks it.
+            _yaml_loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        try:
+            key = (os.path.abspath(file), os.stat(file).st_mtime_ns)
+        except OSError:
+            key = None
+        if key is not None and key in _YAML_CACHE:
+            return _YAML_CACHE[key]
+        # The file object goes straight to the loader, which scans it
+        # incrementally instead of through an in-memory copy.
+        with open(file, 'r', encoding='utf-8') as yf:
+            yaml_data = _yaml.load(yf, Loader=_yaml_loader) or {}
+        if key is not None:
+            _YAML_CACHE[key] = yaml_data
+        return yaml_data
+
+    def _cache_path(self, command_file):
+        """
+        brief: Computes the cache file path for a command file.
+
+        param: command_file - The path of the command file.
+
+        return: The cache path, or None if the file cannot be stat'd.
+        """
+        try:
+            st = os.stat(command_file)
+        except OSError:
+            return None
+        key = hashlib.sha256(
+            f"{os.path.abspath(command_file)}:"
+            f"{st.st_mtime_ns}:{st.st_size}".encode()).hexdigest()
+        return os.path.join(CACHE_DIR, f"{key}.pickle")
+
+    def _load_command_data(self, command_file):
+        """
+        brief: Loads the raw command data, preferring the pickle cache
+               over a fresh YAML parse.
+
+        The cache key includes the file's mtime and size, so a stale
+        entry is simply never looked up again. Only the raw dict is
+        cached; commands are still bound against the live symbol table.
+
+        param: command_file - The path of the command file.
+
+        return: The raw command data.
+        """
+        cache_path = self._cache_path(command_file)
+        if cache_path is not None and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as cf:
+                    return pickle.load(cf)
+            except Exception:
+                # A truncated or corrupt cache entry (EOFError, bad
+                # pickle, unreadable file) must never be fatal; fall
+                # through to the YAML parse, which rewrites it.
+                pass
+        yaml_data = self._load_yaml(command_file)
+        if cache_path is not None:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR)
+                with os.fdopen(fd, 'wb') as cf:
+                    pickle.dump(yaml_data, cf,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass
+        return yaml_data
+
+    def _parse_command_file(self, command_file):
+        """
+        brief: Parses the command file into the command tree.
+
+        param: command_file - The path of the command file.
+        """
+        yaml_data = self._load_command_data(command_file)
+        if yaml_data is None or 'commands' not in yaml_data:
+            raise CommandNoCommandsError()
+        commands = yaml_data['commands']
+        if not isinstance(commands, dict):
+            raise CommandInvalidTypeError('commands', dict)
+        self._raw_commands = commands
+        for name, data in commands.items():
+            if data is not None and not isinstance(data, dict):
+                raise CommandInvalidTypeError(name, dict)
+            self._parse_command(name, data)
+            self._node_tree.add_child(self._create_node(name, data))
+        self._cmd_lens = frozenset(self._parsers_by_len)
+
+    def _resolve(self, name):
+        """
+        brief: Materializes the Command for a top-level name, binding
+               its actions against the symbol table on first use.
+
+        param: name - The command name.
+
+        return: The Command, or None if the name is not defined.
+        """
+        cmd = self._cmd_index.get(name)
+        if cmd is None:
+            if name not in self._raw_commands:
+                return None
+            cmd = self._create_command(name, self._raw_commands[name])
+            self._cmd_index[name] = cmd
+        return cmd
+
+    def _create_command(self, name, data, parent=None):
+        """
+        brief: Creates a Command from its YAML definition, binding its
+               action against the symbol table.
+
+        param: name - The command name.
+        param: data - The command's YAML section.
+        param: parent - The parent Command, if any.
+
+        return: The created Command.
+        """
+        if data is not None and not isinstance(data, dict):
+            raise CommandInvalidTypeError(name, dict)
+        data = data or {}
+        func = None
+        action = data.get('action')
+        if action is not None:
+            if action not in self.symbol_table:
+                raise CommandActionNotFound(action)
+            func = self.symbol_table[action]
+        cmd = Command(name, func, parent)
+        subcommands = data.get('subcommands') or {}
+        if not isinstance(subcommands, dict):
+            raise CommandInvalidTypeError('subcommands', dict)
+        for sub_name, sub_data in subcommands.items():
+            cmd.add_child(self._create_command(sub_name, sub_data, cmd))
+        return cmd
+
+    def _create_node(self, name, data):
+        """
+        brief: Creates the completion tree node for a command.
+
+        param: name - The command name.
+        param: data - The command's YAML section.
+
+        return: The created CommandNode.
+        """
+        if data is not None and not isinstance(data, dict):
+            raise CommandInvalidTypeError(name, dict)
+        node = CommandNode(name)
+        data = data or {}
+        subcommands = data.get('subcommands') or {}
+        if not isinstance(subcommands, dict):
+            raise CommandInvalidTypeError('subcommands', dict)
+        for sub_name, sub_data in subcommands.items():
+            node.add_child(self._create_node(sub_name, sub_data))
+        return node
+
+    def _parse_command(self, name, data):
+        """
+        brief: Builds the argument parser for a command.
+
+        param: name - The command name.
+        param: data - The command's YAML section.
+        """
+        # argparse is only needed once a command file is parsed, and
+        # importing it is a measurable slice of interpreter startup.
+        import argparse
+        data = data or {}
+        cmd_parser = argparse.ArgumentParser(prog=name, add_help=False)
+        args = data.get('args') or []
+        if not isinstance(args, list):
+            raise CommandInvalidTypeError('args', list)
+        positionals = []
+        for arg in args:
+            if not isinstance(arg, dict):
+                raise CommandInvalidTypeError('args', dict)
+            arg_name = arg.get('name')
+            arg_type = TYPE_DICT.get(arg.get('type', 'str'), str)
+            arg_help = arg.get('help')
+            if arg.get('optional', False):
+                cmd_parser.add_argument(f"--{arg_name}",
+                                        type=arg_type, help=arg_help)
+            else:
+                cmd_parser.add_argument(arg_name,
+                                        type=arg_type, help=arg_help)
+                positionals.append(arg_name)
+        # Cached for the parse-error path, which would otherwise dig
+        # the names back out of argparse's action groups.
+        cmd_parser._positionals_cache = positionals
+        # Usage is formatted lazily on the first parse error; building
+        # it here would run argparse's help formatter per command at
+        # startup.
+        self._parsers_by_len.setdefault(len(name), {})[name] = cmd_parser
+
+    def _dispatch(self, cmd_parse):
+        """
+        brief: Dispatches a parsed command line to its bound function.
+
+        param: cmd_parse - The tokenized command line.
+        """
+        name = cmd_parse[0]
+        if len(name) not in self._cmd_lens:
+            # No command of this length exists; reject without touching
+            # the name indexes at all.
+            raise DispatchNotFoundError(name)
+
+        cmd_class = self._resolve(name)
+        if cmd_class is None:
+            raise DispatchNotFoundError(name)
+
+        # Walk down the subcommand tree as far as the tokens match.
+        idx = 1
+        while idx < len(cmd_parse):
+            child_class = None
+            for child in cmd_class.children:
+                if child.name == cmd_parse[idx]:
+                    child_class = child
+            if child_class is None:
+                break
+            cmd_class = child_class
+            idx += 1
+
+        cmd_parser = self._parsers_by_len[len(name)].get(name)
+        if cmd_parser is None:
+            raise DispatchNotFoundError(name)
+
+        try:
+            args = cmd_parser.parse_args(cmd_parse[idx:])
+        except SystemExit:
+            usage = cmd_parser.usage
+            if usage is None:
+                usage = cmd_parser.format_usage().split(':', 1)[1].strip()
+                cmd_parser.usage = usage
+            print(_USG, usage)
+            if cmd_parser._positionals_cache:
+                print(_POS, " ".join(cmd_parser._positionals_cache))
+            return
+
+        if cmd_class.func is not None:
+            cmd_class.func(args)
+
+    def _replace_line(self, new_cmd):
+        """
+        brief: Replaces the current command on screen in one write.
+
+        Uses carriage return plus erase-to-end-of-line, a fixed-size
+        escape sequence, rather than backspacing over the old command
+        character by character.
+
+        param: new_cmd - The replacement command string.
+        """
+        sys.stdout.write("\r\x1b[K" + self.prompt_str + new_cmd)
+        sys.stdout.flush()
+
+    def _prompt(self):
+        """
+        brief: Prompts for a single command, handling line editing,
+               history, and tab completion.
+
+        return: The entered command string.
+        """
+        # Bind the keys and callables touched on every keystroke to
+        # locals, keeping attribute and global lookups out of the loop.
+        # Keys are bound as raw ints so comparisons stay integer-only.
+        k_ctrl_c = int(Key.CTRL_C)
+        k_return = int(Key.RETURN)
+        k_backspace = int(Key.BACKSPACE)
+        k_tab = int(Key.TAB)
+        k_up = int(Key.UP)
+        k_down = int(Key.DOWN)
+        k_left = int(Key.LEFT)
+        k_right = int(Key.RIGHT)
+        _get_key = get_key
+        _printable_run = get_printable_run
+
+        def _emit(s, _write=sys.stdout.write, _flush=sys.stdout.flush):
+            # One write and one flush per prompt event; branches that
+            # produce no output skip the flush syscall entirely.
+            _write(s)
+            _flush()
+
+        _emit(self.prompt_str)
+        # The line is a gap buffer: the characters left of the cursor
+        # and, stored reversed, the characters right of it, so editing
+        # at the cursor is O(1) regardless of line length.
+        left = []
+        right = []
+        hist_idx = -1
+        # The last TAB tokenization, reused while the buffer is unchanged.
+        last_split = None
+        while True:
+            inp = _get_key()
+
+            if inp == k_ctrl_c:
+                raise KeyboardInterrupt
+
+            if inp == k_return:
+                _emit("\n")
+                return "".join(left) + "".join(reversed(right))
+
+            if inp == k_backspace:
+                if not left:
+                    continue
+                left.pop()
+                if not right:
+                    # Deleting at the end needs no tail redraw.
+                    _emit("\b \b")
+                else:
+                    tail = "".join(reversed(right))
+                    _emit("\b" + tail + " " + "\b" * (len(tail) + 1))
+                continue
+
+            if inp == k_tab:
+                cmd_str = "".join(left) + "".join(reversed(right))
+                if last_split is not None and last_split[0] == cmd_str:
+                    parse = last_split[1][:]
+                else:
+                    # Command and subcommand names are plain words, so
+                    # completion never needs shlex's quoting rules.
+                    parse = cmd_str.split()
+                    last_split = (cmd_str, parse[:])
+                if len(cmd_str) == 0 or cmd_str[-1] == " ":
+                    parse.append("")
+
+                # Walk the completion tree down to the last token.
+                cur_node = self._node_tree
+                valid = True
+                for token in parse[:-1]:
+                    next_node = cur_node.children_by_name.get(token)
+                    if next_node is None:
+                        valid = False
+                        break
+                    cur_node = next_node
+                if not valid:
+                    continue
+
+                token = parse[-1]
+                match_names, prefix = cur_node.completions(token)
+                if len(match_names) == 0:
+                    continue
+
+                if len(match_names) == 1:
+                    # Sole match; complete the token in place.
+                    parse[-1] = match_names[0]
+                    new_cmd = " ".join(parse) + " "
+                else:
+                    # Several matches; print them and complete as far
+                    # as the common prefix allows.
+                    parse[-1] = prefix
+                    if parse[-1] == "":
+                        parse = parse[:-1]
+                        new_cmd = " ".join(parse)
+                        if len(new_cmd) > 0:
+                            new_cmd += " "
+                    else:
+                        new_cmd = " ".join(parse)
+                    _emit("\n" + "    ".join(match_names) + "\n" +
+                           self.prompt_str + new_cmd)
+                    left = list(new_cmd)
+                    right = []
+                    continue
+
+                # Blank the current line and redraw the completion.
+                self._replace_line(new_cmd)
+                left = list(new_cmd)
+                right = []
+                continue
+
+            if inp == k_up:
+                if hist_idx + 1 >= len(self.history):
+                    continue
+                hist_idx += 1
+                new_cmd = self.history[hist_idx]
+                self._replace_line(new_cmd)
+                left = list(new_cmd)
+                right = []
+                continue
+
+            if inp == k_down:
+                if hist_idx < 0:
+                    continue
+                hist_idx -= 1
+                if hist_idx < 0:
+                    new_cmd = ""
+                else:
+                    new_cmd = self.history[hist_idx]
+                self._replace_line(new_cmd)
+                left = list(new_cmd)
+                right = []
+                continue
+
+            if inp == k_left:
+                if left:
+                    _emit("\b")
+                    right.append(left.pop())
+                continue
+
+            if inp == k_right:
+                if right:
+                    ch = right.pop()
+                    left.append(ch)
+                    _emit(ch)
+                continue
+
+            # Anything left that isn't a plain character is ignored.
+            if not isinstance(inp, str) or len(inp) != 1:
+                continue
+
+            if len(left) + len(right) >= MAX_CMD_LEN:
+                continue
+
+            # Pasted input queues up behind the first character; insert
+            # the whole printable run in one batch.
+            inp += _printable_run()
+            inp = inp[:MAX_CMD_LEN - len(left) - len(right)]
+
+            left.extend(inp)
+            if not right:
+                # Typing at the end is the common case; just echo.
+                _emit(inp)
+            else:
+                tail = "".join(reversed(right))
+                _emit(inp + tail + "\b" * len(tail))
@@ -0,0 +1,99 @@
+"""
+file: error.py
+
+brief: Exception classes raised by conpycon.
+"""
+
+class YAMLError(Exception):
+    """
+    brief: Base class for errors encountered while loading a command file.
+    """
+    pass
+
+class CommandError(Exception):
+    """
+    brief: Base class for errors in the command file's command definitions.
+    """
+    pass
+
+class CommandNoCommandsError(CommandError):
+    """
+    brief: Raised when the command file has no 'commands' section.
+    """
+    def __str__(self):
+        return "command file contains no 'commands' section"
+
+class CommandInvalidTypeError(CommandError):
+    """
+    brief: Raised when a command file section has an unexpected type.
+
+    Holds the raw fields and formats its message only when rendered,
+    since these are often raised inside a try/except that never
+    displays them.
+    """
+    def __init__(self, name, good_type):
+        super().__init__()
+        self.name = name
+        self.good_type = good_type
+
+    def __str__(self):
+        return f"section '{self.name}' expects type " \
+               f"'{self.good_type.__name__}'"
+
+class CommandActionNotFound(CommandError):
+    """
+    brief: Raised when a command's action is not in the symbol table.
+    """
+    def __init__(self, action):
+        super().__init__()
+        self.action = action
+
+    def __str__(self):
+        return f"action '{self.action}' not found in symbol table"
+
+class DuplicateArgumentError(CommandError):
+    """
+    brief: Raised when an argument name is registered twice on a parser.
+    """
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def __str__(self):
+        return f"duplicate argument: '{self.name}'"
+
+class ParseError(CommandError):
+    """
+    brief: Raised when a command line does not match its parser's
+           arguments.
+    """
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def __str__(self):
+        return f"invalid arguments for command: '{self.name}'"
+
+class MissingArgumentError(ParseError):
+    """
+    brief: Raised when a required argument or option value is absent.
+    """
+    def __str__(self):
+        return f"missing value for argument: '{self.name}'"
+
+class DispatchError(Exception):
+    """
+    brief: Base class for errors encountered while dispatching a command.
+    """
+    pass
+
+class DispatchNotFoundError(DispatchError):
+    """
+    brief: Raised when a dispatched command does not exist.
+    """
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def __str__(self):
+        return f"unknown command: '{self.name}'"
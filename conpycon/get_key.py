@@ -0,0 +1,121 @@
+"""
+file: get_key.py
+
+brief: Raw keypress handling for the console prompt.
+"""
+
+import collections
+import os
+import select
+import sys
+import termios
+import tty
+from enum import IntEnum
+
+class Key(IntEnum):
+    """
+    brief: Special keys handled by the console prompt.
+
+    An IntEnum so hot-loop comparisons degrade to plain int compares.
+    """
+    CTRL_C = 3
+    TAB = 9
+    RETURN = 13
+    BACKSPACE = 127
+    UP = 1000
+    DOWN = 1001
+    RIGHT = 1002
+    LEFT = 1003
+
+# Escape sequences for the arrow keys.
+ARROW_DICT = {
+    'A': Key.UP,
+    'B': Key.DOWN,
+    'C': Key.RIGHT,
+    'D': Key.LEFT,
+}
+
+# Maps single control characters to their keys.
+CTRL_DICT = {
+    '\x03': Key.CTRL_C,
+    '\r': Key.RETURN,
+    '\n': Key.RETURN,
+    '\x7f': Key.BACKSPACE,
+    '\t': Key.TAB,
+}
+
+# Characters read from stdin but not yet consumed. Pasted input lands
+# here in one read instead of one syscall per character.
+_pending = collections.deque()
+
+def _drain(fd):
+    """
+    brief: Pulls everything already buffered on stdin into the queue
+           without blocking.
+
+    param: fd - The stdin file descriptor (already in raw mode).
+    """
+    while select.select([fd], [], [], 0)[0]:
+        data = os.read(fd, 4096)
+        if not data:
+            break
+        _pending.extend(data.decode(errors='replace'))
+
+def _fill(n):
+    """
+    brief: Ensures at least n characters are queued, reading from
+           stdin in raw mode as needed.
+
+    param: n - The number of characters required.
+    """
+    if len(_pending) >= n:
+        return
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    try:
+        tty.setraw(fd)
+        while len(_pending) < n:
+            data = os.read(fd, 4096)
+            if not data:
+                break
+            _pending.extend(data.decode(errors='replace'))
+        _drain(fd)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
+def get_key():
+    """
+    brief: Reads a single keypress from stdin without echoing it.
+
+    return: A Key member for special keys, or the literal character.
+    """
+    _fill(1)
+    if not _pending:
+        return Key.RETURN
+    ch = _pending.popleft()
+    if ch == '\x1b':
+        # Arrow keys arrive as a three-byte escape sequence.
+        _fill(2)
+        if len(_pending) >= 2 and _pending[0] == '[':
+            seq = _pending[1]
+            if seq in ARROW_DICT:
+                _pending.popleft()
+                _pending.popleft()
+                return ARROW_DICT[seq]
+        return ch
+    return CTRL_DICT.get(ch, ch)
+
+def get_printable_run():
+    """
+    brief: Consumes the run of already-queued printable characters.
+
+    Never blocks; returns an empty string when the next queued
+    character is a control character or nothing is queued. Lets the
+    prompt insert pasted input in one batch.
+
+    return: The queued printable characters.
+    """
+    run = []
+    while _pending and _pending[0] >= ' ' and _pending[0] != '\x7f':
+        run.append(_pending.popleft())
+    return "".join(run)
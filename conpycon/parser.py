@@ -0,0 +1,399 @@
+"""
+file: parser.py
+
+brief: The CommandParser class, a small argument parser tailored to
+       console commands.
+"""
+
+import sys
+from enum import IntEnum
+
+from conpycon.error import (
+    DuplicateArgumentError,
+    MissingArgumentError,
+    ParseError,
+)
+
+_RESET = '\033[0m'
+
+# Maps color names to their ANSI escape sequences. The None entry is
+# the no-color fallback, so callers resolve a color with one
+# COLOR_DICT.get(color, _RESET) and no truthiness dance.
+COLOR_DICT = {
+    None: _RESET,
+    'black': '\033[30m',
+    'red': '\033[31m',
+    'green': '\033[32m',
+    'yellow': '\033[33m',
+    'blue': '\033[34m',
+    'magenta': '\033[35m',
+    'cyan': '\033[36m',
+    'white': '\033[37m',
+}
+
+# The most Namespace instances a parser keeps around for reuse.
+_MAX_NS_POOL = 8
+
+# Help-section headers pre-formatted per color, so print_help does a
+# single lookup instead of rebuilding the same f-strings every call.
+# Each entry is (color code, usage, positionals, optionals, flags).
+HEADER_CACHE = {
+    color: (code,
+            f"\n[{code}Usage{_RESET}]",
+            f"\n[{code}Positional Arguments{_RESET}]",
+            f"\n[{code}Optional Arguments{_RESET}]",
+            f"\n[{code}Flags{_RESET}]")
+    for color, code in COLOR_DICT.items()
+}
+
+class ArgumentType(IntEnum):
+    """
+    brief: The kinds of arguments a command can take.
+
+    An IntEnum so kind checks in the parse path are plain int
+    comparisons.
+    """
+    POSITIONAL = 1
+    OPTIONAL = 2
+    FLAG = 3
+
+# Bound at module scope so hot comparisons load one global instead of
+# a global plus an attribute.
+_POSITIONAL = ArgumentType.POSITIONAL
+_OPTIONAL = ArgumentType.OPTIONAL
+_FLAG = ArgumentType.FLAG
+
+class Argument:
+    """
+    brief: A single argument registered on a CommandParser.
+    """
+    __slots__ = ('arg_type', 'name', 'metaname', 'type', 'help')
+
+    def __init__(self, arg_type, name, metaname, type, help):
+        self.arg_type = arg_type
+        self.name = name
+        self.metaname = metaname
+        self.type = type
+        self.help = help
+
+class Namespace:
+    """
+    brief: A simple attribute container for parsed argument values.
+    """
+    def __init__(self, **kwargs):
+        # One C-level dict update instead of a setattr per key; the
+        # class has no descriptors, so the two are equivalent.
+        self.__dict__.update(kwargs)
+
+    def __eq__(self, other):
+        if not isinstance(other, Namespace):
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+    def __hash__(self):
+        # Hashable so parsed results can key caches; assumes the held
+        # values are themselves hashable.
+        return hash(tuple(sorted(self.__dict__.items())))
+
+class CommandParser:
+    """
+    brief: Collects the arguments for a single command and formats its
+           usage and help text.
+    """
+    # Token prefixes distinguishing optionals and flags.
+    _OPT_PREFIX = '--'
+    _FLAG_PREFIX = '-'
+
+    @staticmethod
+    def _classify(tok):
+        """
+        brief: Classifies a token by its prefix.
+
+        Slice-and-compare against the short literals; CPython resolves
+        these small comparisons faster than a startswith call.
+
+        param: tok - The token to classify.
+
+        return: The ArgumentType of the token.
+        """
+        if tok[:2] == '--':
+            return _OPTIONAL
+        if tok[:1] == '-':
+            return _FLAG
+        return _POSITIONAL
+
+    def __init__(self, name, description=None):
+        self.name = name
+        self.description = description
+        # Arguments are stored as parallel per-field lists rather than
+        # lists of Argument objects, so the usage and help loops walk
+        # flat lists with no per-element attribute reads.
+        self.positional_names = []
+        self.positional_types = []
+        self.positional_helps = []
+        self.optional_names = []
+        self.optional_types = []
+        self.optional_helps = []
+        self.flag_names = []
+        self.flag_metanames = []
+        self.flag_helps = []
+        # Name indexes kept alongside the ordered lists so duplicate
+        # checks and lookups are O(1) instead of a scan per add.
+        # Each maps a name to its position in the lists above.
+        self._positional_names = {}
+        self._optional_names = {}
+        self._flag_names = {}
+        self._flag_metanames = {}
+        # The formatted usage line, rebuilt only after a new argument
+        # is registered.
+        self._usage_cache = None
+        # The parse function generated for this parser's exact argument
+        # shape, rebuilt only after a new argument is registered.
+        self._compiled_parse = None
+        # Namespaces released after dispatch, reused instead of
+        # allocating a fresh container per command.
+        self._ns_pool = []
+
+    def _acquire_ns(self, **kwargs):
+        """
+        brief: Returns a Namespace holding kwargs, reusing a pooled
+               instance when one is available.
+
+        param: kwargs - The parsed argument values.
+
+        return: The populated Namespace.
+        """
+        if self._ns_pool:
+            ns = self._ns_pool.pop()
+            ns.__dict__.clear()
+            ns.__dict__.update(kwargs)
+            return ns
+        return Namespace(**kwargs)
+
+    def release_ns(self, ns):
+        """
+        brief: Returns a Namespace to the pool once the dispatched
+               command is done with it.
+
+        param: ns - The Namespace to recycle.
+        """
+        if len(self._ns_pool) < _MAX_NS_POOL:
+            self._ns_pool.append(ns)
+
+    @property
+    def positionals(self):
+        """
+        brief: The registered positional arguments as Argument objects,
+               zipped lazily from the field lists.
+        """
+        return [Argument(_POSITIONAL, n, None, t, h)
+                for n, t, h in zip(self.positional_names,
+                                   self.positional_types,
+                                   self.positional_helps)]
+
+    @property
+    def optionals(self):
+        """
+        brief: The registered optional arguments as Argument objects,
+               zipped lazily from the field lists.
+        """
+        return [Argument(_OPTIONAL, n, None, t, h)
+                for n, t, h in zip(self.optional_names,
+                                   self.optional_types,
+                                   self.optional_helps)]
+
+    @property
+    def flags(self):
+        """
+        brief: The registered flags as Argument objects, zipped lazily
+               from the field lists.
+        """
+        return [Argument(_FLAG, n, m, bool, h)
+                for n, m, h in zip(self.flag_names,
+                                   self.flag_metanames,
+                                   self.flag_helps)]
+
+    def _check_duplicate(self, name):
+        """
+        brief: Raises if a name is already registered in any category.
+
+        param: name - The argument name to check.
+        """
+        if (name in self._positional_names or
+                name in self._optional_names or
+                name in self._flag_names):
+            raise DuplicateArgumentError(name)
+
+    def add_positional(self, name, type=str, help=None):
+        """
+        brief: Registers a positional argument.
+
+        param: name - The argument name.
+        param: type - The type the value is converted to.
+        param: help - The help text for the argument.
+        """
+        # Interned names make the index lookups and namespace attribute
+        # reads hit CPython's pointer-equality fast path.
+        name = sys.intern(name)
+        self._check_duplicate(name)
+        self._positional_names[name] = len(self.positional_names)
+        self.positional_names.append(name)
+        self.positional_types.append(type)
+        self.positional_helps.append(help)
+        self._usage_cache = None
+        self._compiled_parse = None
+
+    def add_optional(self, name, type=str, help=None):
+        """
+        brief: Registers an optional (--name value) argument.
+
+        param: name - The argument name.
+        param: type - The type the value is converted to.
+        param: help - The help text for the argument.
+        """
+        name = sys.intern(name)
+        self._check_duplicate(name)
+        self._optional_names[name] = len(self.optional_names)
+        self.optional_names.append(name)
+        self.optional_types.append(type)
+        self.optional_helps.append(help)
+        self._usage_cache = None
+        self._compiled_parse = None
+
+    def add_flag(self, name, metaname, help=None):
+        """
+        brief: Registers a boolean flag with a short and long name.
+
+        param: name - The short flag name (-name).
+        param: metaname - The long flag name (--metaname).
+        param: help - The help text for the flag.
+        """
+        name = sys.intern(name)
+        metaname = sys.intern(metaname)
+        self._check_duplicate(name)
+        if metaname in self._flag_metanames:
+            raise DuplicateArgumentError(metaname)
+        self._flag_names[name] = len(self.flag_names)
+        self._flag_metanames[metaname] = len(self.flag_names)
+        self.flag_names.append(name)
+        self.flag_metanames.append(metaname)
+        self.flag_helps.append(help)
+        self._usage_cache = None
+        self._compiled_parse = None
+
+    def _compile(self):
+        """
+        brief: Generates a parse function specialized to this parser's
+               argument shape.
+
+        The argument set is fixed once registration is done, so the
+        generic interpret-the-lists loop is replaced with straight-line
+        code emitted per argument and compiled once with exec.
+        """
+        lines = ["def _parse(tokens, d):"]
+        n_pos = len(self.positional_names)
+        if n_pos:
+            # Tokens come straight from the user; a short command line
+            # must surface as a typed error, not an IndexError.
+            lines.append(f"    if len(tokens) < {n_pos}:")
+            lines.append("        raise _missing(_pnames[len(tokens)])")
+        for i, name in enumerate(self.positional_names):
+            lines.append(f"    d[{name!r}] = _ptypes[{i}](tokens[{i}])")
+        for i, name in enumerate(self.optional_names):
+            lines.append(f"    if '--{name}' in tokens:")
+            lines.append(f"        _i = tokens.index('--{name}') + 1")
+            lines.append("        if _i >= len(tokens):")
+            lines.append(f"            raise _missing({name!r})")
+            lines.append(f"        d[{name!r}] = _otypes[{i}](tokens[_i])")
+            lines.append("    else:")
+            lines.append(f"        d[{name!r}] = None")
+        for name, metaname in zip(self.flag_names, self.flag_metanames):
+            lines.append(f"    d[{name!r}] = '-{name}' in tokens or "
+                         f"'--{metaname}' in tokens")
+        if len(lines) == 1:
+            lines.append("    pass")
+        namespace = {
+            '_ptypes': tuple(self.positional_types),
+            '_otypes': tuple(self.optional_types),
+            '_pnames': tuple(self.positional_names),
+            '_missing': MissingArgumentError,
+        }
+        exec("\n".join(lines), namespace)
+        self._compiled_parse = namespace['_parse']
+
+    def parse(self, tokens):
+        """
+        brief: Parses command tokens into a Namespace.
+
+        param: tokens - The tokens following the command name.
+
+        return: The populated Namespace; pass it back through
+                release_ns when the handler is done with it.
+        """
+        if self._compiled_parse is None:
+            self._compile()
+        ns = self._acquire_ns()
+        try:
+            self._compiled_parse(tokens, ns.__dict__)
+        except ValueError:
+            # A failed type conversion; recycle the namespace and
+            # surface a conpycon error rather than the raw ValueError.
+            self.release_ns(ns)
+            raise ParseError(self.name) from None
+        return ns
+
+    def get_usage(self):
+        """
+        brief: Formats the one-line usage string for the command.
+
+        The result is cached; registering a new argument invalidates
+        it, so repeated help requests skip the rebuild.
+
+        return: The usage string.
+        """
+        if self._usage_cache is not None:
+            return self._usage_cache
+        # Built as a list and joined once; += on a string reallocates
+        # per piece.
+        parts = [self.name]
+        parts.extend(f' {name}' for name in self.positional_names)
+        parts.extend(f' [--{name} [{type.__name__}]]'
+                     for name, type in zip(self.optional_names,
+                                           self.optional_types))
+        parts.extend(f' [-{name}]' for name in self.flag_names)
+        usage_str = "".join(parts)
+        self._usage_cache = usage_str
+        return usage_str
+
+    def print_help(self, color=None):
+        """
+        brief: Prints the full help text for the command.
+
+        param: color - The name of the color used for headers.
+        """
+        color_str, usage_hdr, pos_hdr, opt_hdr, flag_hdr = \
+            HEADER_CACHE.get(color, HEADER_CACHE[None])
+        # Collect every line and emit once, so a help request costs a
+        # single write instead of a flushing print per line.
+        out = [f"{color_str}{self.name}{_RESET}"]
+        if self.description is not None:
+            out.append(self.description)
+        out.append(usage_hdr)
+        out.append(self.get_usage())
+        if self.positional_names:
+            out.append(pos_hdr)
+            for name, help in zip(self.positional_names,
+                                  self.positional_helps):
+                out.append(f"  {name:<16} {help or ''}")
+        if self.optional_names:
+            out.append(opt_hdr)
+            for name, help in zip(self.optional_names,
+                                  self.optional_helps):
+                out.append(f"  --{name:<14} {help or ''}")
+        if self.flag_names:
+            out.append(flag_hdr)
+            for name, metaname, help in zip(self.flag_names,
+                                            self.flag_metanames,
+                                            self.flag_helps):
+                out.append(f"  -{name}, --{metaname:<10} {help or ''}")
+        sys.stdout.write("\n".join(out) + "\n")
@@ -0,0 +1,73 @@
+import sys
+
+from setuptools import setup, find_packages
+
+# The README only matters when package metadata is being published;
+# skip the read (and close the handle) for every other invocation.
+if any(cmd in sys.argv for cmd in ('sdist', 'bdist_wheel', 'upload')):
+    with open('README.md', encoding='utf-8') as f:
+        long_description = f.read()
+else:
+    long_description = ''
+
+# Compile the parser to a native extension when Cython and a C
+# toolchain are available; the pure-Python module is used as-is
+# otherwise. Cythonization only runs for commands that actually build,
+# so metadata queries never regenerate C sources.
+_BUILD_CMDS = ('build', 'build_ext', 'bdist_wheel', 'install', 'develop')
+
+ext_modules = []
+cmdclass = {}
+if any(cmd in sys.argv for cmd in _BUILD_CMDS):
+    try:
+        from Cython.Build import cythonize
+        from setuptools.command.build_ext import build_ext
+        from distutils.errors import (
+            CCompilerError,
+            DistutilsExecError,
+            DistutilsPlatformError,
+        )
+
+        class optional_build_ext(build_ext):
+            """
+            brief: Builds the extension when the toolchain allows, and
+                   falls back to the pure-Python module when it fails.
+            """
+            def run(self):
+                try:
+                    build_ext.run(self)
+                except (CCompilerError, DistutilsExecError,
+                        DistutilsPlatformError):
+                    pass
+
+            def build_extension(self, ext):
+                try:
+                    build_ext.build_extension(self, ext)
+                except (CCompilerError, DistutilsExecError,
+                        DistutilsPlatformError):
+                    pass
+
+        ext_modules = cythonize(
+            ['conpycon/parser.py'],
+            language_level=3,
+        )
+        cmdclass = {'build_ext': optional_build_ext}
+    except ImportError:
+        pass
+
+setup(
+    name='conpycon',
+    version='0.1.0',
+    author='Mike Rosinsky',
+    description='A configurable Python console',
+    long_description=long_description,
+    long_description_content_type='text/markdown',
+    url='https://github.com/m-rosinsky/ConPyCon',
+    packages=find_packages(exclude=('old',)),
+    ext_modules=ext_modules,
+    cmdclass=cmdclass,
+    install_requires=[
+        'PyYAML',
+    ],
+    python_requires='>=3.8',
+)